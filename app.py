@@ -2,14 +2,22 @@ import streamlit as st
 import yfinance as yf
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+import plotly.io as pio
+import math
+from datetime import date, datetime, timedelta
+
+from utils.downsample import lttb_indices, ohlc_minmax_bin
+from utils.indicators import INDICATOR_COLUMNS, compute_indicators, returns_std
+from utils.store import clear_history, is_fresh, load_history, save_history
+
+# Serialize figures with orjson (C-level JSON of NumPy arrays) instead of the stdlib encoder
+pio.json.config.default_engine = 'orjson'
 
 # === PAGE CONFIGURATION ===
 st.set_page_config(layout="wide", page_title="TradeView Pro")
 
 # === CSS ===
-st.markdown("""
+CSS = """
 <style>
     .stApp { background-color: #0a192f; }
     
@@ -48,7 +56,18 @@ st.markdown("""
         font-size: 0.95rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+# Must be re-emitted on every rerun: Streamlit drops any element a rerun doesn't write again
+st.markdown(CSS, unsafe_allow_html=True)
+
+DISCLAIMER_HTML = """
+<div class="disclaimer">
+    <strong>⚠️ LEGAL DISCLAIMER</strong><br><br>
+    This dashboard is strictly for <strong>educational and research purposes only</strong>. 
+    All data, forecasts, and technical indicators are generated algorithmically using mathematical models (Linear Regression, Moving Averages) and <strong>do not constitute financial advice</strong>, investment recommendations, or an offer to buy/sell any assets.<br><br>
+    The developer assumes no liability for any financial losses. Past performance is not indicative of future results. <strong>Trade at your own risk.</strong>
+</div>
+"""
 
 # === SIDEBAR ===
 st.sidebar.header("📊 Asset Selection")
@@ -61,64 +80,374 @@ selected_tf = st.sidebar.selectbox("Range", timeframe_options, index=4)
 
 if st.sidebar.button("🔄 Clear Cache"):
     st.cache_data.clear()
+    clear_history()
 
 # === LEGAL DISCLAIMER (SIDEBAR) ===
-st.sidebar.markdown("""
-<div class="disclaimer">
-    <strong>⚠️ LEGAL DISCLAIMER</strong><br><br>
-    This dashboard is strictly for <strong>educational and research purposes only</strong>. 
-    All data, forecasts, and technical indicators are generated algorithmically using mathematical models (Linear Regression, Moving Averages) and <strong>do not constitute financial advice</strong>, investment recommendations, or an offer to buy/sell any assets.<br><br>
-    The developer assumes no liability for any financial losses. Past performance is not indicative of future results. <strong>Trade at your own risk.</strong>
-</div>
-""", unsafe_allow_html=True)
+st.sidebar.markdown(DISCLAIMER_HTML, unsafe_allow_html=True)
 
 # === SMART DATA ENGINE ===
-@st.cache_data(ttl=3600)
-def get_data(symbol, tf_label):
+def get_date_range(tf_label, as_of):
+    # Whole days, so the range is identical for every rerun on `as_of`; yfinance's `end` is exclusive,
+    # hence tomorrow's midnight to keep today's bar
+    today = datetime.combine(as_of, datetime.min.time())
+    end_date = today + timedelta(days=1)
+    if tf_label == "1M": view_start = today - timedelta(days=30)
+    elif tf_label == "3M": view_start = today - timedelta(days=90)
+    elif tf_label == "6M": view_start = today - timedelta(days=180)
+    elif tf_label == "YTD": view_start = datetime(today.year, 1, 1)
+    elif tf_label == "1Y": view_start = today - timedelta(days=365)
+    elif tf_label == "3Y": view_start = today - timedelta(days=365*3)
+    elif tf_label == "5Y": view_start = today - timedelta(days=365*5)
+    else: view_start = datetime(1980, 1, 1)
+
+    math_start = view_start - timedelta(days=300)
+    return view_start, math_start, end_date
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# Bounded so a long-running server doesn't keep a Ticker for every symbol anyone has typed
+@st.cache_resource(max_entries=64, ttl=timedelta(hours=6))
+def _ticker(symbol):
+    # Reused across reruns and sessions so the Ticker's cookie/crumb state survives cache misses
+    return yf.Ticker(symbol)
+
+def downcast(df):
+    # float32 keeps ~7 significant digits, plenty for quotes, and halves memory/payload size
+    df = df.astype({c: 'float32' for c in PRICE_COLUMNS if c in df.columns})
+    # Split-adjusted share counts can exceed 2**31, so only narrow Volume when it fits
+    vol = df['Volume']
+    if vol.notna().all() and vol.max() < 2**31:
+        df['Volume'] = vol.astype('int32')
+    return df
+
+def fetch_history(symbols, start, end):
+    # Both paths must return the same adjusted prices: the disk copy is shared between them, and
+    # yf.download only defaulted to auto_adjust=True from 0.2.51
+    if len(symbols) == 1:
+        frames = {symbols[0]: _ticker(symbols[0]).history(start=start, end=end, auto_adjust=True)}
+    else:
+        # One threaded request for the pair: wall-clock ~ max(latency) instead of the sum
+        raw = yf.download(list(symbols), start=start, end=end, group_by='ticker', auto_adjust=True, threads=True, progress=False)
+        # group_by='ticker' puts the symbol on the outer column level, so raw[sym] is already flat
+        frames = {sym: raw[sym] if raw is not None and sym in raw.columns.get_level_values(0) else None for sym in symbols}
+
+    data = {}
+    for sym, df in frames.items():
+        if df is not None:
+            # A NaN close would poison the running sums in the indicator kernel
+            df = df.dropna(subset=['Close'])
+        if df is None or df.empty:
+            data[sym] = None
+            continue
+
+        # yf.download already returns naive dates; only Ticker.history needs the exchange tz dropped
+        if df.index.tz is not None:
+            df.index = df.index.tz_localize(None)
+        data[sym] = downcast(df)
+    return data
+
+def merge_tail(cached, new):
+    # `new` starts at the second-to-last cached bar, which is final; if Yahoo re-adjusted
+    # history since (split/dividend), that bar's close no longer matches and the cache is stale
+    overlap = new.index[0]
+    if overlap not in cached.index or not np.isclose(cached.at[overlap, 'Close'], new['Close'].iat[0], rtol=1e-4):
+        return None
+    return pd.concat([cached[cached.index < overlap], new])
+
+class FetchError(Exception):
+    # Raised out of get_data_batch so st.cache_data doesn't keep a degraded result for the whole TTL;
+    # carries whatever could still be served (disk copies, or None per symbol)
+    def __init__(self, data, view_start):
+        super().__init__("history refresh failed")
+        self.data = data
+        self.view_start = view_start
+
+def try_fetch(symbols, start, end):
+    # yfinance re-raises some errors (e.g. YFRateLimitError) even with hide_exceptions on;
+    # report the failure instead so callers can fall back to disk per symbol
     try:
-        end_date = datetime.today()
-        if tf_label == "1M": view_start = end_date - timedelta(days=30)
-        elif tf_label == "3M": view_start = end_date - timedelta(days=90)
-        elif tf_label == "6M": view_start = end_date - timedelta(days=180)
-        elif tf_label == "YTD": view_start = datetime(end_date.year, 1, 1)
-        elif tf_label == "1Y": view_start = end_date - timedelta(days=365)
-        elif tf_label == "3Y": view_start = end_date - timedelta(days=365*3)
-        elif tf_label == "5Y": view_start = end_date - timedelta(days=365*5)
-        else: view_start = datetime(1980, 1, 1)
-
-        math_start = view_start - timedelta(days=300)
+        return fetch_history(symbols, start, end), False
+    except Exception:
+        return {}, True
+
+def refresh_history(symbols, cached, math_start, end_date):
+    # Symbols whose disk copy covers the window only need the latest bars; the rest are fetched in full.
+    # Returns (data, failed); on a failed request each symbol keeps its disk copy, if any
+    tail_start = min((df.index[-2] for df, _ in cached.values()), default=math_start)
+    start = math_start if len(cached) < len(symbols) else tail_start
+    fresh, failed = try_fetch(symbols, start, end_date)
+
+    data = {}
+    stale = []
+    for sym in symbols:
+        df, new = None, fresh.get(sym)
+        fetched_from = cached[sym][1] if sym in cached else math_start
+        if sym in cached and new is not None:
+            df = merge_tail(cached[sym][0], new)
+            if df is None:
+                stale.append(sym)
+                continue
+        elif new is not None:
+            df = new
+        elif sym in cached:
+            df = cached[sym][0]
+        if df is not None and new is not None:
+            save_history(sym, df, fetched_from)
+        data[sym] = df
+
+    if stale:
+        refetched, stale_failed = try_fetch(tuple(stale), math_start, end_date)
+        failed = failed or stale_failed
+        for sym in stale:
+            df = refetched.get(sym)
+            if df is not None:
+                save_history(sym, df, math_start)
+            else:
+                df = cached[sym][0]
+            data[sym] = df
+    return data, failed
+
+@st.cache_data(ttl=3600)
+def get_data_batch(symbols, tf_label, as_of):
+    # `symbols` is a sorted tuple so the cache key is order-independent; `as_of` rolls the key over at midnight
+    view_start, math_start, end_date = get_date_range(tf_label, as_of)
+
+    # L2: on-disk history; a copy refreshed within the last hour is used as-is
+    data = {}
+    cached = {}
+    for sym in symbols:
+        df, fetched_from, fetched_at = load_history(sym)
+        if df is None or len(df) < 2 or fetched_from > math_start:
+            continue
+        if is_fresh(fetched_at):
+            data[sym] = df
+        else:
+            cached[sym] = (df, fetched_from)
+
+    failed = False
+    pending = tuple(sym for sym in symbols if sym not in data)
+    if pending:
+        refreshed, failed = refresh_history(pending, cached, math_start, end_date)
+        data.update(refreshed)
+
+    # Indicators are computed inside the cache boundary, so a warm rerun returns annotated frames
+    for sym, df in data.items():
+        if df is not None:
+            data[sym] = calculate_metrics(df.loc[math_start:].copy(deep=False))
+    if failed: raise FetchError(data, view_start)
+    return data, view_start
+
+def calculate_metrics(df):
+    # Too short for any indicator; the columns still exist so callers can read them as NaN
+    if len(df) < 2:
+        df[INDICATOR_COLUMNS] = np.full((len(df), len(INDICATOR_COLUMNS)), np.nan, dtype=np.float32)
+        return df
+
+    df[INDICATOR_COLUMNS] = compute_indicators(df['Close'].to_numpy(dtype=np.float32)).T
+
+    return df
+
+SQRT_252 = math.sqrt(252)  # trading days per year, for annualizing daily volatility
+MAX_PLOT_POINTS = 2000
+CANDLE_BIN_THRESHOLD = 1500
+MAX_CANDLES = 1000
+
+def plot_points(values):
+    # Rows to send to Plotly: everything for short ranges, an LTTB subset for long ones
+    if len(values) <= MAX_PLOT_POINTS: return slice(None)
+    return lttb_indices(np.require(values, np.float64, ['C', 'W']), MAX_PLOT_POINTS)
+
+def _fast_linfit(y):
+    # Closed-form degree-1 least squares against x = 0..n-1 (no Vandermonde matrix / LAPACK call)
+    n = len(y)
+    x = np.arange(n, dtype=np.float64)
+    xm = x.mean()
+    ym = y.mean()
+    dx = x - xm
+    slope = dx @ (y - ym) / (dx @ dx)
+    return slope, ym - slope * xm
+
+def pct_from_first(c):
+    # % change from the first bar, in one preallocated buffer of the input dtype
+    ret = np.empty_like(c)
+    np.divide(c, c[0], out=ret)
+    ret -= 1.0
+    ret *= 100.0
+    return ret
+
+# === FIGURE BUILDERS ===
+# Cached on a cheap stamp of the data; the frames themselves are `_`-prefixed so Streamlit doesn't hash them.
+# Each entry holds full trace arrays, so every builder keeps only the most recent few ticker/range views
+FIG_CACHE_ENTRIES = 32
+
+def frame_stamp(df):
+    # Today's bar updates intraday, so the last close is part of the identity; a split/dividend
+    # re-adjustment rewrites earlier closes, which the first close and the column sum pick up
+    close = df['Close'].to_numpy()
+    return len(df), df.index[0], df.index[-1], float(close[0]), float(close[-1]), float(close.sum(dtype=np.float64))
+
+# Shared by every chart; Streamlit resolves the template name when it builds the figure
+BASE_LAYOUT = {'template': 'plotly_dark', 'paper_bgcolor': 'rgba(0,0,0,0)', 'plot_bgcolor': 'rgba(0,0,0,0)'}
+
+def hline(y, color):
+    # What fig.add_hline emits: a dashed line spanning the full plot width at `y`
+    return {'type': 'line', 'xref': 'paper', 'x0': 0, 'x1': 1, 'yref': 'y', 'y0': y, 'y1': y, 'line': {'dash': 'dash', 'color': color}}
+
+@st.cache_data(ttl=3600, max_entries=FIG_CACHE_ENTRIES)
+def build_price_fig(ticker, tf_label, stamp, _view_df1):
+    # SVG candlesticks bog down past a few thousand bars; merge them into wider candles first
+    candle_df = ohlc_minmax_bin(_view_df1, MAX_CANDLES) if len(_view_df1) > CANDLE_BIN_THRESHOLD else _view_df1
+    x = candle_df.index.values
+    data = [{'type': 'candlestick', 'x': x, 'open': candle_df['Open'].to_numpy(), 'high': candle_df['High'].to_numpy(), 'low': candle_df['Low'].to_numpy(), 'close': candle_df['Close'].to_numpy(), 'name': 'Price'}]
+    if not candle_df['SMA_50'].isna().all():
+        data.append({'type': 'scatter', 'x': x, 'y': candle_df['SMA_50'].to_numpy(), 'line': {'color': '#64ffda', 'width': 1}, 'name': 'SMA 50'})
+    layout = {**BASE_LAYOUT, 'title': {'text': f"{ticker} Price History ({tf_label})"}, 'yaxis': {'title': {'text': "USD"}}, 'height': 500, 'xaxis': {'rangeslider': {'visible': False}}}
+    return {'data': data, 'layout': layout}
+
+@st.cache_data(ttl=3600, max_entries=FIG_CACHE_ENTRIES)
+def build_bollinger_fig(ticker, tf_label, stamp, _view_df1):
+    plot_df = _view_df1.iloc[plot_points(_view_df1['Close'])]
+    x = plot_df.index.values
+    band = {'color': 'rgba(100, 255, 218, 0.5)', 'width': 1}
+    data = [
+        {'type': 'scatter', 'x': x, 'y': plot_df['Close'].to_numpy(), 'line': {'color': '#e6f1ff', 'width': 1}, 'name': 'Price'},
+        {'type': 'scatter', 'x': x, 'y': plot_df['BB_Upper'].to_numpy(), 'line': band, 'name': 'Upper'},
+        {'type': 'scatter', 'x': x, 'y': plot_df['BB_Lower'].to_numpy(), 'line': band, 'name': 'Lower', 'fill': 'tonexty'},
+    ]
+    return {'data': data, 'layout': {**BASE_LAYOUT, 'title': {'text': "Bollinger Bands"}, 'height': 400}}
+
+@st.cache_data(ttl=3600, max_entries=FIG_CACHE_ENTRIES)
+def build_rsi_fig(ticker, tf_label, stamp, _view_df1):
+    # Same LTTB rows as the Bollinger chart so both panels line up
+    plot_df = _view_df1.iloc[plot_points(_view_df1['Close'])]
+    data = [{'type': 'scatter', 'x': plot_df.index.values, 'y': plot_df['RSI'].to_numpy(), 'line': {'color': '#fee440', 'width': 2}, 'name': 'RSI'}]
+    layout = {**BASE_LAYOUT, 'title': {'text': "RSI"}, 'height': 400, 'yaxis': {'range': [0, 100]}, 'shapes': [hline(70, "red"), hline(30, "green")]}
+    return {'data': data, 'layout': layout}
+
+@st.cache_data(ttl=3600, max_entries=FIG_CACHE_ENTRIES)
+def build_comparison_fig(ticker, comp_ticker, tf_label, stamp, _x, _ret1, _ret2):
+    rows1 = plot_points(_ret1)
+    rows2 = plot_points(_ret2)
+    data = [
+        {'type': 'scatter', 'x': _x[rows1], 'y': _ret1[rows1], 'name': ticker, 'line': {'color': '#64ffda', 'width': 2}},
+        {'type': 'scatter', 'x': _x[rows2], 'y': _ret2[rows2], 'name': comp_ticker, 'line': {'color': '#ff0055', 'width': 2}},
+    ]
+    return {'data': data, 'layout': {**BASE_LAYOUT, 'title': {'text': "Relative Performance (%)"}, 'height': 500}}
+
+@st.cache_data(ttl=3600, max_entries=FIG_CACHE_ENTRIES)
+def build_forecast_fig(ticker, tf_label, stamp, slope, intercept, _view_df1):
+    y = _view_df1['Close'].to_numpy(dtype=np.float64)
+
+    future_days = 30
+    last_x = len(y) - 1
+    future_X = np.arange(last_x, last_x + future_days, dtype=np.float64)
+    future_dates = pd.date_range(start=_view_df1.index[-1] + pd.Timedelta('1D'), periods=future_days, freq='B')  # trading days, skipping weekends
+    forecast_y = slope * future_X + intercept
+
+    hist = _view_df1['Close'].iloc[plot_points(y)]
+    data = [
+        {'type': 'scatter', 'x': hist.index.values, 'y': hist.to_numpy(), 'name': 'History', 'line': {'color': '#8892b0', 'width': 1}},
+        {'type': 'scatter', 'x': future_dates.values, 'y': forecast_y, 'name': 'Forecast', 'line': {'color': '#ff0055', 'width': 3, 'dash': 'dot'}},
+    ]
+    return {'data': data, 'layout': {**BASE_LAYOUT, 'title': {'text': "Linear Regression Trend"}, 'height': 500}}
+
+# === TAB RENDERERS ===
+def render_price_tab(view_df1, ticker, tf_label, curr_price):
+    st.plotly_chart(build_price_fig(ticker, tf_label, frame_stamp(view_df1), view_df1), use_container_width=True)
+
+    with st.expander("💡 Analyst Insight: Trend Analysis", expanded=True):
+        sma_val = view_df1['SMA_50'].iat[-1]
+        if pd.isna(sma_val):
+            st.markdown('<div class="insight-box">⚠️ <strong>Insufficient Data:</strong> Cannot calculate the 50-Day trend yet. Try a longer timeframe or older stock.</div>', unsafe_allow_html=True)
+        else:
+            sma_val = float(sma_val)
+            if curr_price > sma_val:
+                trend_html = '<span style="color:#64ffda; font-weight:bold;">BULLISH (Upward)</span>'
+            else:
+                trend_html = '<span style="color:#ff5f5f; font-weight:bold;">BEARISH (Downward)</span>'
+            
+            st.markdown(f"""
+            <div class="insight-box">
+                The current price (<strong>${curr_price:.2f}</strong>) is trading {trend_html} relative to the 50-Day Moving Average (<strong>${sma_val:.2f}</strong>).
+                <br>• Trading above the SMA-50 suggests short-term strength.
+                <br>• Trading below suggests weakness.
+            </div>
+            """, unsafe_allow_html=True)
+
+def render_technicals_tab(view_df1, ticker, tf_label, curr_price, last_rsi):
+    stamp = frame_stamp(view_df1)
+    col_t1, col_t2 = st.columns(2)
+    with col_t1:
+        st.plotly_chart(build_bollinger_fig(ticker, tf_label, stamp, view_df1), use_container_width=True)
+    with col_t2:
+        st.plotly_chart(build_rsi_fig(ticker, tf_label, stamp, view_df1), use_container_width=True)
+
+    with st.expander("💡 Analyst Insight: Momentum & Volatility", expanded=True):
+        # RSI Logic
+        if pd.isna(last_rsi):
+            rsi_msg = "Calculating..."
+        elif last_rsi > 70: 
+            rsi_msg = "⚠️ <strong style='color:#ff5f5f'>Overbought (>70)</strong>: Potential pullback."
+        elif last_rsi < 30: 
+            rsi_msg = "✅ <strong style='color:#64ffda'>Oversold (<30)</strong>: Potential bounce."
+        else: 
+            rsi_msg = "ℹ️ <strong>Neutral (30-70)</strong>: Healthy trading range."
         
-        stock = yf.Ticker(symbol)
-        df = stock.history(start=math_start, end=end_date)
+        # BB Logic
+        bb_upper = view_df1['BB_Upper'].iat[-1]
+        bb_lower = view_df1['BB_Lower'].iat[-1]
+        bb_status = "Price is within normal bands."
+        if pd.notnull(bb_upper):
+            if curr_price >= bb_upper:
+                bb_status = "⚠️ Price is touching the <strong>Upper Band</strong> (Potential breakout or pullback)."
+            elif curr_price <= bb_lower:
+                bb_status = "✅ Price is touching the <strong>Lower Band</strong> (Potential bounce)."
         
-        if df.empty: return None, None
+        st.markdown(f"""
+        <div class="insight-box">
+            <strong>RSI Status:</strong> {rsi_msg}<br>
+            <strong>Bollinger Bands:</strong> {bb_status}
+        </div>
+        """, unsafe_allow_html=True)
 
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+def render_comparison_tab(df1, df2, view_start1, ticker, comp_ticker, tf_label):
+    if df2 is not None:
+        # One inner join on the sorted indexes instead of an intersection plus two lookups
+        close1, close2 = df1['Close'].loc[view_start1:].align(df2['Close'], join='inner')
+        if not close1.empty:
+            common_idx = close1.index
+            ret1 = pct_from_first(close1.to_numpy(dtype=np.float32))
+            ret2 = pct_from_first(close2.to_numpy(dtype=np.float32))
+            
+            stamp = (frame_stamp(df1), frame_stamp(df2), common_idx[0])
+            st.plotly_chart(build_comparison_fig(ticker, comp_ticker, tf_label, stamp, common_idx.values, ret1, ret2), use_container_width=True)
             
-        df.index = df.index.tz_localize(None)
-        return df, view_start
-    except:
-        return None, None
+            a = close1.to_numpy(dtype=np.float64)
+            b = close2.to_numpy(dtype=np.float64)
+            
+            da = a - a.mean()
+            db = b - b.mean()
+            with np.errstate(invalid='ignore', divide='ignore'):
+                corr = float(da @ db / np.sqrt((da @ da) * (db @ db)))
+            with st.expander("💡 Correlation", expanded=True):
+                st.markdown(f'<div class="insight-box"><strong>Correlation Coefficient: {corr:.2f}</strong></div>', unsafe_allow_html=True)
+        else:
+            st.warning("No overlapping data found.")
+    else:
+        st.info("Enter comparison ticker in sidebar.")
 
-def calculate_metrics(df):
-    if len(df) < 2: return df
-    
-    df['SMA_50'] = df['Close'].rolling(window=50).mean()
-    df['SMA_200'] = df['Close'].rolling(window=200).mean()
-    
-    sma20 = df['Close'].rolling(window=20).mean()
-    std = df['Close'].rolling(window=20).std()
-    df['BB_Upper'] = sma20 + (std * 2)
-    df['BB_Lower'] = sma20 - (std * 2)
-    
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    
-    return df
+def render_forecast_tab(view_df1, ticker, tf_label):
+    st.subheader(f"AI Trend Projection: {ticker}")
+    if len(view_df1) > 10:
+        y = view_df1['Close'].to_numpy(dtype=np.float64)
+        slope, intercept = _fast_linfit(y)
+        st.plotly_chart(build_forecast_fig(ticker, tf_label, frame_stamp(view_df1), slope, intercept, view_df1), use_container_width=True)
+        
+        with st.expander("💡 Predictive Model", expanded=True):
+            trend = "UPWARD" if slope > 0 else "DOWNWARD"
+            st.markdown(f'<div class="insight-box">Linear Regression indicates an <strong>{trend}</strong> trajectory.<br>Slope: {slope:.4f}</div>', unsafe_allow_html=True)
+    else:
+        st.warning("Not enough data points for AI prediction.")
 
 # === APP LOGIC ===
 if comp_ticker:
@@ -126,181 +455,59 @@ if comp_ticker:
 else:
     st.title(f"📈 TradeView: {ticker}")
 
-raw_df1, view_start1 = get_data(ticker, selected_tf)
-raw_df2, _ = get_data(comp_ticker, selected_tf) if comp_ticker else (None, None)
+symbols = tuple(sorted({ticker, comp_ticker} - {""}))
+try:
+    batch, view_start1 = get_data_batch(symbols, selected_tf, date.today())
+except FetchError as e:
+    # Not cached, so the next rerun tries Yahoo again
+    batch, view_start1 = e.data, e.view_start
+    st.warning("Couldn't refresh prices from Yahoo Finance; showing the last saved history where available.")
+df1 = batch.get(ticker)
+df2 = batch.get(comp_ticker) if comp_ticker else None
 
-if raw_df1 is not None and not raw_df1.empty:
-    try:
-        df1 = calculate_metrics(raw_df1)
-        view_df1 = df1[df1.index >= view_start1].copy()
-        
-        if view_df1.empty:
-            st.warning("Data loaded, but timeframe is empty. Try a longer range.")
-            st.stop()
-
-        # Metrics
-        curr_price = float(view_df1['Close'].iloc[-1])
-        prev_price = float(view_df1['Close'].iloc[-2])
-        delta = float(curr_price - prev_price)
-        pct_change = view_df1['Close'].pct_change()
-        volatility = float(pct_change.std() * 100 * (252**0.5)) if len(view_df1) > 1 else 0.0
-        
-        c1, c2, c3, c4 = st.columns(4)
-        c1.metric(f"{ticker} Price", f"${curr_price:.2f}", f"{delta:.2f}")
-        c2.metric("Volatility", f"{volatility:.2f}%")
-        
-        last_rsi = df1['RSI'].iloc[-1]
-        rsi_txt = f"{last_rsi:.1f}" if pd.notnull(last_rsi) else "N/A"
-        c3.metric("RSI (14-Day)", rsi_txt)
-        
-        if raw_df2 is not None:
-            c4.metric(f"{comp_ticker} Price", f"${float(raw_df2['Close'].iloc[-1]):.2f}")
-        else:
-            c4.metric("Volume", f"{int(view_df1['Volume'].iloc[-1]):,}")
-
-        # === TABS ===
-        tab1, tab2, tab3, tab4 = st.tabs(["📉 Price Action", "📊 Technicals", "⚔️ Comparison", "🤖 AI Forecast"])
-
-        # TAB 1: PRICE
-        with tab1:
-            fig = go.Figure()
-            fig.add_trace(go.Candlestick(x=view_df1.index, open=view_df1['Open'], high=view_df1['High'], low=view_df1['Low'], close=view_df1['Close'], name='Price'))
-            if not view_df1['SMA_50'].isna().all():
-                fig.add_trace(go.Scatter(x=view_df1.index, y=view_df1['SMA_50'], line=dict(color='#64ffda', width=1), name='SMA 50'))
-            fig.update_layout(title=f"{ticker} Price History ({selected_tf})", yaxis_title="USD", template="plotly_dark", height=500, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', xaxis_rangeslider_visible=False)
-            st.plotly_chart(fig, use_container_width=True)
-
-            with st.expander("💡 Analyst Insight: Trend Analysis", expanded=True):
-                sma_val = df1['SMA_50'].iloc[-1]
-                if pd.isna(sma_val):
-                    st.markdown('<div class="insight-box">⚠️ <strong>Insufficient Data:</strong> Cannot calculate the 50-Day trend yet. Try a longer timeframe or older stock.</div>', unsafe_allow_html=True)
-                else:
-                    sma_val = float(sma_val)
-                    if curr_price > sma_val:
-                        trend_html = '<span style="color:#64ffda; font-weight:bold;">BULLISH (Upward)</span>'
-                    else:
-                        trend_html = '<span style="color:#ff5f5f; font-weight:bold;">BEARISH (Downward)</span>'
-                    
-                    st.markdown(f"""
-                    <div class="insight-box">
-                        The current price (<strong>${curr_price:.2f}</strong>) is trading {trend_html} relative to the 50-Day Moving Average (<strong>${sma_val:.2f}</strong>).
-                        <br>• Trading above the SMA-50 suggests short-term strength.
-                        <br>• Trading below suggests weakness.
-                    </div>
-                    """, unsafe_allow_html=True)
-
-        # TAB 2: TECHNICALS
-        with tab2:
-            col_t1, col_t2 = st.columns(2)
-            with col_t1:
-                bfig = go.Figure()
-                bfig.add_trace(go.Scatter(x=view_df1.index, y=view_df1['Close'], line=dict(color='#e6f1ff', width=1), name='Price'))
-                bfig.add_trace(go.Scatter(x=view_df1.index, y=view_df1['BB_Upper'], line=dict(color='rgba(100, 255, 218, 0.5)', width=1), name='Upper'))
-                bfig.add_trace(go.Scatter(x=view_df1.index, y=view_df1['BB_Lower'], line=dict(color='rgba(100, 255, 218, 0.5)', width=1), name='Lower', fill='tonexty'))
-                bfig.update_layout(title="Bollinger Bands", template="plotly_dark", height=400, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-                st.plotly_chart(bfig, use_container_width=True)
-            with col_t2:
-                rfig = go.Figure()
-                rfig.add_trace(go.Scatter(x=view_df1.index, y=view_df1['RSI'], line=dict(color='#fee440', width=2), name='RSI'))
-                rfig.add_hline(y=70, line_dash="dash", line_color="red")
-                rfig.add_hline(y=30, line_dash="dash", line_color="green")
-                rfig.update_layout(title="RSI", template="plotly_dark", height=400, yaxis_range=[0,100], paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-                st.plotly_chart(rfig, use_container_width=True)
-
-            with st.expander("💡 Analyst Insight: Momentum & Volatility", expanded=True):
-                # RSI Logic
-                if pd.isna(last_rsi):
-                    rsi_msg = "Calculating..."
-                elif last_rsi > 70: 
-                    rsi_msg = "⚠️ <strong style='color:#ff5f5f'>Overbought (>70)</strong>: Potential pullback."
-                elif last_rsi < 30: 
-                    rsi_msg = "✅ <strong style='color:#64ffda'>Oversold (<30)</strong>: Potential bounce."
-                else: 
-                    rsi_msg = "ℹ️ <strong>Neutral (30-70)</strong>: Healthy trading range."
-                
-                # BB Logic
-                bb_upper = df1['BB_Upper'].iloc[-1]
-                bb_lower = df1['BB_Lower'].iloc[-1]
-                bb_status = "Price is within normal bands."
-                if pd.notnull(bb_upper):
-                    if curr_price >= bb_upper:
-                        bb_status = "⚠️ Price is touching the <strong>Upper Band</strong> (Potential breakout or pullback)."
-                    elif curr_price <= bb_lower:
-                        bb_status = "✅ Price is touching the <strong>Lower Band</strong> (Potential bounce)."
-                
-                st.markdown(f"""
-                <div class="insight-box">
-                    <strong>RSI Status:</strong> {rsi_msg}<br>
-                    <strong>Bollinger Bands:</strong> {bb_status}
-                </div>
-                """, unsafe_allow_html=True)
-
-        # TAB 3: COMPARISON
-        with tab3:
-            if raw_df2 is not None:
-                common_idx = df1.index.intersection(raw_df2.index)
-                common_idx = common_idx[common_idx >= view_start1]
-                if not common_idx.empty:
-                    base1 = df1.loc[common_idx[0], 'Close']
-                    base2 = raw_df2.loc[common_idx[0], 'Close']
-                    norm1 = (df1.loc[common_idx, 'Close'] / base1 - 1) * 100
-                    norm2 = (raw_df2.loc[common_idx, 'Close'] / base2 - 1) * 100
-                    
-                    comp_fig = go.Figure()
-                    comp_fig.add_trace(go.Scatter(x=common_idx, y=norm1, name=ticker, line=dict(color='#64ffda', width=2)))
-                    comp_fig.add_trace(go.Scatter(x=common_idx, y=norm2, name=comp_ticker, line=dict(color='#ff0055', width=2)))
-                    comp_fig.update_layout(title="Relative Performance (%)", template="plotly_dark", height=500, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-                    st.plotly_chart(comp_fig, use_container_width=True)
-                    
-                    corr = df1.loc[common_idx, 'Close'].corr(raw_df2.loc[common_idx, 'Close'])
-                    with st.expander("💡 Correlation", expanded=True):
-                        st.markdown(f'<div class="insight-box"><strong>Correlation Coefficient: {corr:.2f}</strong></div>', unsafe_allow_html=True)
-                else:
-                    st.warning("No overlapping data found.")
-            else:
-                st.info("Enter comparison ticker in sidebar.")
-
-        # TAB 4: AI FORECAST
-        with tab4:
-            st.subheader(f"AI Trend Projection: {ticker}")
-            if len(view_df1) > 10:
-                view_df1['Num'] = range(len(view_df1))
-                X = np.array(view_df1['Num'])
-                y = np.array(view_df1['Close'])
-                z = np.polyfit(X, y, 1)
-                p = np.poly1d(z)
-                
-                future_days = 30
-                last_x = X[-1]
-                future_X = np.arange(last_x, last_x + future_days)
-                future_dates = [view_df1.index[-1] + timedelta(days=i) for i in range(1, future_days + 1)]
-                
-                ffig = go.Figure()
-                ffig.add_trace(go.Scatter(x=view_df1.index, y=view_df1['Close'], name='History', line=dict(color='#8892b0', width=1)))
-                ffig.add_trace(go.Scatter(x=future_dates, y=p(future_X), name='Forecast', line=dict(color='#ff0055', width=3, dash='dot')))
-                ffig.update_layout(title="Linear Regression Trend", template="plotly_dark", height=500, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-                st.plotly_chart(ffig, use_container_width=True)
-                
-                with st.expander("💡 Predictive Model", expanded=True):
-                    slope = z[0]
-                    trend = "UPWARD" if slope > 0 else "DOWNWARD"
-                    st.markdown(f'<div class="insight-box">Linear Regression indicates an <strong>{trend}</strong> trajectory.<br>Slope: {slope:.4f}</div>', unsafe_allow_html=True)
-            else:
-                st.warning("Not enough data points for AI prediction.")
+if df1 is not None and not df1.empty:
+    # The index is sorted, so this is a binary-search slice; nothing downstream mutates it
+    view_df1 = df1.loc[view_start1:]
+    
+    if view_df1.empty:
+        st.warning("Data loaded, but timeframe is empty. Try a longer range.")
+        st.stop()
 
-    except Exception as e:
-        st.error(f"Error: {e}")
+    # Metrics: pull the columns once; the scalars below are plain array reads
+    closes = view_df1['Close'].to_numpy()
+    vols = view_df1['Volume'].to_numpy()
+    curr_price = float(closes[-1])
+    delta = float(closes[-1] - closes[-2]) if len(closes) > 1 else 0.0
+    volatility = returns_std(closes) * 100 * SQRT_252 if len(closes) > 1 else 0.0
+    
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric(f"{ticker} Price", f"${curr_price:.2f}", f"{delta:.2f}")
+    c2.metric("Volatility", f"{volatility:.2f}%")
+    
+    last_rsi = df1['RSI'].iat[-1]
+    rsi_txt = f"{last_rsi:.1f}" if pd.notnull(last_rsi) else "N/A"
+    c3.metric("RSI (14-Day)", rsi_txt)
+    
+    if df2 is not None:
+        c4.metric(f"{comp_ticker} Price", f"${float(df2['Close'].iat[-1]):.2f}")
+    else:
+        c4.metric("Volume", f"{int(vols[-1]):,}")
+
+    # === TABS ===
+    tab1, tab2, tab3, tab4 = st.tabs(["📉 Price Action", "📊 Technicals", "⚔️ Comparison", "🤖 AI Forecast"])
+
+    with tab1:
+        render_price_tab(view_df1, ticker, selected_tf, curr_price)
+    with tab2:
+        render_technicals_tab(view_df1, ticker, selected_tf, curr_price, last_rsi)
+    with tab3:
+        render_comparison_tab(df1, df2, view_start1, ticker, comp_ticker, selected_tf)
+    with tab4:
+        render_forecast_tab(view_df1, ticker, selected_tf)
 
 else:
     st.warning("Data not found.")
 
 # === FOOTER DISCLAIMER ===
 st.markdown("---")
-st.markdown("""
-<div class="disclaimer">
-    <strong>⚠️ LEGAL DISCLAIMER</strong><br><br>
-    This dashboard is strictly for <strong>educational and research purposes only</strong>. 
-    All data, forecasts, and technical indicators are generated algorithmically using mathematical models (Linear Regression, Moving Averages) and <strong>do not constitute financial advice</strong>, investment recommendations, or an offer to buy/sell any assets.<br><br>
-    The developer assumes no liability for any financial losses. Past performance is not indicative of future results. <strong>Trade at your own risk.</strong>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(DISCLAIMER_HTML, unsafe_allow_html=True)
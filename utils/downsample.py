@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from utils._njit import njit
+
+
+@njit('i8[::1](f8[::1], i8)', cache=True, nogil=True)
+def lttb_indices(y, n_out):
+    """Largest-Triangle-Three-Buckets: positions of `n_out` points that preserve the shape of `y`."""
+    n = y.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[n_out - 1] = n - 1
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        # Average of the next bucket is the third vertex of the triangle
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = (next_start + next_end - 1) / 2.0
+        avg_y = y[next_start:next_end].mean()
+
+        best = start
+        best_area = -1.0
+        for j in range(start, end):
+            area = abs((a - avg_x) * (y[j] - y[a]) - (a - j) * (avg_y - y[a]))
+            if area > best_area:
+                best_area = area
+                best = j
+        out[i + 1] = best
+        a = best
+    return out
+
+
+def ohlc_minmax_bin(df, target):
+    """Merge consecutive bars into about `target` candles: first open, max high, min low, last close, summed volume."""
+    n = len(df)
+    size = -(-n // target)
+    starts = np.arange(0, n, size)
+    ends = np.append(starts[1:], n) - 1
+
+    out = pd.DataFrame({
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        'Close': df['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(df['Volume'].to_numpy(), starts, dtype=np.int64),
+    }, index=df.index[ends])
+    # Each candle is stamped with its last bar, so overlays such as SMA_50 take the end-of-bucket value, like Close
+    for col in df.columns.difference(out.columns):
+        out[col] = df[col].to_numpy()[ends]
+    return out
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils._njit import HAS_NUMBA, njit
+
+SMA_FAST = 50
+SMA_SLOW = 200
+BB_WINDOW = 20
+BB_STD = 2.0
+RSI_WINDOW = 14
+
+# Row order of the array returned by compute_indicators
+INDICATOR_COLUMNS = ['SMA_50', 'SMA_200', 'BB_Upper', 'BB_Lower', 'RSI']
+_N_INDICATORS = len(INDICATOR_COLUMNS)
+
+
+# Explicit signatures compile (or load from the on-disk cache) at import, before the first rerun;
+# the window lengths above are module constants, so LLVM sees them as literals. The kernels touch no
+# Python objects, so nogil lets them run while other threads (e.g. chart serialization) hold the GIL
+@njit(['f4[:, ::1](f4[::1])', 'f8[:, ::1](f8[::1])'], cache=True, fastmath=True, nogil=True)
+def _indicators_loop(close):
+    # Outputs keep the input dtype; accumulators stay float64 so float32 prices don't drift
+    n = close.shape[0]
+    out = np.full((_N_INDICATORS, n), np.nan, dtype=close.dtype)
+    sma_fast = out[0]
+    sma_slow = out[1]
+    bb_upper = out[2]
+    bb_lower = out[3]
+    rsi = out[4]
+
+    fast_sum = 0.0
+    slow_sum = 0.0
+    bb_mean = 0.0
+    bb_m2 = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+
+    for i in range(n):
+        x = float(close[i])
+
+        # SMA: add the newest bar, drop the one leaving the window
+        fast_sum += x
+        if i >= SMA_FAST:
+            fast_sum -= close[i - SMA_FAST]
+        if i >= SMA_FAST - 1:
+            sma_fast[i] = fast_sum / SMA_FAST
+
+        slow_sum += x
+        if i >= SMA_SLOW:
+            slow_sum -= close[i - SMA_SLOW]
+        if i >= SMA_SLOW - 1:
+            sma_slow[i] = slow_sum / SMA_SLOW
+
+        # Bollinger: Welford variance over a sliding window (sample std, like pandas)
+        if i < BB_WINDOW:
+            d = x - bb_mean
+            bb_mean += d / (i + 1)
+            bb_m2 += d * (x - bb_mean)
+        else:
+            old = float(close[i - BB_WINDOW])
+            prev_mean = bb_mean
+            bb_mean += (x - old) / BB_WINDOW
+            bb_m2 += (x - old) * (x - bb_mean + old - prev_mean)
+        if i >= BB_WINDOW - 1:
+            sd = np.sqrt(max(bb_m2, 0.0) / (BB_WINDOW - 1))
+            bb_upper[i] = bb_mean + BB_STD * sd
+            bb_lower[i] = bb_mean - BB_STD * sd
+
+        # RSI: Wilder smoothing, seeded with the simple average of the first 14 moves
+        if i > 0:
+            d = x - float(close[i - 1])
+            gain = d if d > 0 else 0.0
+            loss = -d if d < 0 else 0.0
+            if i <= RSI_WINDOW:
+                avg_gain += gain / RSI_WINDOW
+                avg_loss += loss / RSI_WINDOW
+            else:
+                avg_gain = (avg_gain * (RSI_WINDOW - 1) + gain) / RSI_WINDOW
+                avg_loss = (avg_loss * (RSI_WINDOW - 1) + loss) / RSI_WINDOW
+        if i >= RSI_WINDOW:
+            total = avg_gain + avg_loss
+            if total > 0:
+                rsi[i] = 100.0 * avg_gain / total
+
+    return out
+
+
+def _window_sums(cs, w):
+    # Sum of each trailing window of length w from a zero-prefixed cumsum, NaN-padded to full length
+    out = np.full(cs.shape[0] - 1, np.nan)
+    out[w - 1:] = cs[w:] - cs[:-w]
+    return out
+
+
+def _indicators_vectorized(close):
+    # Same outputs as _indicators_loop with whole-array NumPy ops, for when Numba is missing
+    dtype = close.dtype
+    close = close.astype(np.float64)
+    n = close.shape[0]
+    cs = np.empty(n + 1)
+    cs[0] = 0.0
+    np.cumsum(close, out=cs[1:])
+
+    sma_fast = _window_sums(cs, SMA_FAST) / SMA_FAST
+    sma_slow = _window_sums(cs, SMA_SLOW) / SMA_SLOW
+
+    # Bollinger: one strided view over the 20-bar windows, exact two-pass variance per window
+    bb_upper = np.full(n, np.nan)
+    bb_lower = np.full(n, np.nan)
+    if n >= BB_WINDOW:
+        windows = sliding_window_view(close, BB_WINDOW)
+        mean = windows.mean(axis=1)
+        dev = windows - mean[:, None]
+        sd = np.sqrt(np.einsum('ij,ij->i', dev, dev) / (BB_WINDOW - 1))
+        bb_upper[BB_WINDOW - 1:] = mean + BB_STD * sd
+        bb_lower[BB_WINDOW - 1:] = mean - BB_STD * sd
+
+    # Wilder smoothing is an EWM with alpha=1/14 started from the simple average of the first 14 moves
+    delta = np.diff(close)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    rsi = np.full(n, np.nan)
+    if n > RSI_WINDOW:
+        gains[RSI_WINDOW - 1] = gains[:RSI_WINDOW].mean()
+        losses[RSI_WINDOW - 1] = losses[:RSI_WINDOW].mean()
+        avg_gain = pd.Series(gains[RSI_WINDOW - 1:]).ewm(alpha=1 / RSI_WINDOW, adjust=False).mean().to_numpy()
+        avg_loss = pd.Series(losses[RSI_WINDOW - 1:]).ewm(alpha=1 / RSI_WINDOW, adjust=False).mean().to_numpy()
+        total = avg_gain + avg_loss
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rsi[RSI_WINDOW:] = np.where(total > 0, 100.0 * avg_gain / total, np.nan)
+
+    return np.stack((sma_fast, sma_slow, bb_upper, bb_lower, rsi)).astype(dtype, copy=False)
+
+
+def compute_indicators(close):
+    """Return a (5, n) array of indicators, rows in INDICATOR_COLUMNS order, for a 1-D array of closes."""
+    # The precompiled signatures take writable C arrays; pandas copy-on-write hands out read-only views
+    dtype = np.float32 if close.dtype == np.float32 else np.float64
+    close = np.require(close, dtype, ['C', 'W'])
+    if HAS_NUMBA:
+        return _indicators_loop(close)
+    return _indicators_vectorized(close)
+
+
+@njit(['f8(f4[::1])', 'f8(f8[::1])'], cache=True, nogil=True)
+def _returns_std_loop(close):
+    # Welford over the daily returns as they're formed, so no returns array is materialized
+    mean = 0.0
+    m2 = 0.0
+    k = 0
+    for i in range(1, close.shape[0]):
+        r = float(close[i]) / float(close[i - 1]) - 1.0
+        k += 1
+        d = r - mean
+        mean += d / k
+        m2 += d * (r - mean)
+    if k < 2:
+        return np.nan
+    return np.sqrt(m2 / (k - 1))
+
+
+def returns_std(close):
+    """Return the sample standard deviation of simple daily returns for a 1-D array of closes."""
+    dtype = np.float32 if close.dtype == np.float32 else np.float64
+    close = np.require(close, dtype, ['C', 'W'])
+    if HAS_NUMBA:
+        return float(_returns_std_loop(close))
+    close = close.astype(np.float64)
+    if close.shape[0] < 3:
+        return float('nan')
+    return float((np.diff(close) / close[:-1]).std(ddof=1))
@@ -0,0 +1,49 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_DIR = Path.home() / ".tradeview_cache"
+# A copy refreshed this recently is served without touching the network (matches the in-memory TTL)
+FRESH_FOR = timedelta(hours=1)
+
+
+def _path(symbol):
+    return CACHE_DIR / f"{symbol.replace(os.sep, '_')}.parquet"
+
+
+def load_history(symbol):
+    """Return (df, fetched_from, fetched_at) for a cached symbol, or (None, None, None) when absent or unreadable."""
+    try:
+        df = pd.read_parquet(_path(symbol))
+    except Exception:
+        return None, None, None
+    fetched_from = pd.Timestamp(df.attrs.get('fetched_from', df.index[0]))
+    fetched_at = pd.Timestamp(df.attrs.get('fetched_at', 0))
+    df.attrs = {}
+    return df, fetched_from, fetched_at
+
+
+def is_fresh(fetched_at):
+    return datetime.now() - fetched_at < FRESH_FOR
+
+
+def save_history(symbol, df, fetched_from):
+    # Write to a temp file and rename so concurrent sessions never read a half-written file
+    path = _path(symbol)
+    tmp = path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        out = df.copy(deep=False)
+        out.attrs = {'fetched_from': pd.Timestamp(fetched_from).isoformat(), 'fetched_at': datetime.now().isoformat()}
+        out.to_parquet(tmp, compression='zstd')
+        os.replace(tmp, path)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+
+
+def clear_history():
+    for path in CACHE_DIR.glob("*.parquet"):
+        path.unlink(missing_ok=True)